@@ -0,0 +1,328 @@
+# scripts/load_test.py
+"""Prueba de carga con sesiones concurrentes sobre app.py.
+
+Simula N usuarios que recorren los módulos FERIAS (3 Marías y Plaza Cívica) y
+PACHAMBEAR usando el AppTest headless de Streamlit. Cada sesión corre en su
+propio hilo dentro del mismo proceso, como los ScriptRunner del servidor.
+
+Es una aproximación: AppTest espera cada rerun consultando su estado cada 1 ms
+y no pasa por el websocket ni por la serialización protobuf, así que las
+latencias sirven para comparar entre versiones más que como valor absoluto.
+
+Uso:
+    python scripts/load_test.py --sesiones 1 5 10 20
+"""
+import argparse
+import csv
+import gc
+import math
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+import streamlit.logger
+from streamlit import config
+from streamlit.runtime.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+ORDENES = ["Ascendente", "Descendente", "Por Fecha"]
+INTERVALO_MEMORIA = 0.05
+
+
+# ==== ESCENARIO ====
+def _boton(at, label):
+    boton = next((b for b in at.button if b.label == label), None)
+    if boton is None:
+        raise LookupError(f"botón '{label}' no encontrado")
+    return boton
+
+
+def _radio(at, label):
+    radio = next((r for r in at.radio if r.label == label), None)
+    if radio is None:
+        raise LookupError(f"radio '{label}' no encontrado")
+    return radio
+
+
+def _modulo(nombre):
+    return lambda at: at.sidebar.radio[0].set_value(nombre).run()
+
+
+def _sede(nombre):
+    return lambda at: _radio(at, "Sede:").set_value(nombre).run()
+
+
+def _click(label=None, key=None):
+    if key is not None:
+        return lambda at: at.button(key=key).click().run()
+    return lambda at: _boton(at, label).click().run()
+
+
+def _orden(key, valor):
+    return lambda at: at.selectbox(key=key).set_value(valor).run()
+
+
+def construir_escenario():
+    """Lista de pasos (nombre, acción) que sigue cada usuario simulado"""
+    pasos = [("FERIAS", _modulo("FERIAS")), ("3 Marías", _sede("3 Marías"))]
+    for year in ["2023", "2024", "2025", "Histórico"]:
+        pasos.append((f"3 Marías {year}", _click(label=year)))
+    for orden in ORDENES:
+        pasos.append((f"orden_part {orden}", _orden("orden_part", orden)))
+        pasos.append((f"orden_monto {orden}", _orden("orden_monto", orden)))
+
+    pasos.append(("Plaza Cívica", _sede("Plaza Cívica")))
+    for key in ["btn_2024_plaza", "btn_2025_plaza", "btn_hist_plaza"]:
+        pasos.append((key, _click(key=key)))
+    for orden in ORDENES:
+        pasos.append((f"orden_part_plaza {orden}", _orden("orden_part_plaza", orden)))
+        pasos.append((f"orden_monto_plaza {orden}", _orden("orden_monto_plaza", orden)))
+
+    pasos.append(("PACHAMBEAR", _modulo("PACHAMBEAR")))
+    return pasos
+
+
+# ==== EJECUCIÓN ====
+@contextmanager
+def runtime_compartido():
+    """Mantiene un único Runtime y un único ScriptCache entre sesiones.
+
+    AppTest crea un Runtime simulado al inicio de cada rerun y lo borra al
+    terminar, lo que rompe a las sesiones que siguen ejecutándose en otros
+    hilos. Aquí se conserva el último Runtime visto, como en un servidor real.
+    También crea un ScriptCache nuevo por rerun (en AppTest y en su
+    LocalScriptRunner) y vuelve a compilar app.py desde varios hilos a la
+    vez; el servidor lo compila una sola vez.
+    """
+    visto = []
+    cache = ScriptCache()
+
+    def instance(cls):
+        if cls._instance is not None:
+            visto[:] = [cls._instance]
+            return cls._instance
+        if visto:
+            return visto[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    def exists(cls):
+        return cls._instance is not None or bool(visto)
+
+    app_test_previo = config.get_option("global.appTest")
+    config.set_option("global.appTest", True)
+    try:
+        with mock.patch.object(Runtime, "instance", classmethod(instance)), \
+                mock.patch.object(Runtime, "exists", classmethod(exists)), \
+                mock.patch("streamlit.testing.v1.app_test.ScriptCache", return_value=cache), \
+                mock.patch("streamlit.testing.v1.local_script_runner.ScriptCache",
+                           return_value=cache):
+            yield
+    finally:
+        config.set_option("global.appTest", app_test_previo)
+
+
+def rss_mb():
+    """Memoria residente actual del proceso en MB, o nan si no se puede leer"""
+    try:
+        with open("/proc/self/statm") as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        pass
+    if os.name != "posix":
+        return float("nan")
+    # Sin /proc (macOS): ps también devuelve la memoria actual, en KB
+    try:
+        salida = subprocess.run(["ps", "-o", "rss=", "-p", str(os.getpid())],
+                                capture_output=True, text=True, check=True).stdout
+        return int(salida.strip()) / 1024
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return float("nan")
+
+
+def liberar_memoria():
+    """Recolecta basura y devuelve al sistema la memoria libre de glibc"""
+    gc.collect()
+    try:
+        import ctypes
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class MuestreoMemoria(threading.Thread):
+    """Registra el pico de RSS en segundo plano mientras corre un nivel"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.base = rss_mb()
+        self.pico = self.base
+        self._fin = threading.Event()
+
+    def run(self):
+        while not self._fin.wait(INTERVALO_MEMORIA):
+            self.pico = max(self.pico, rss_mb())
+
+    def detener(self):
+        self._fin.set()
+        self.join()
+        self.pico = max(self.pico, rss_mb())
+
+
+def simular_sesion(at, escenario, barrera, repeticiones, pausa):
+    """Recorre el escenario y devuelve latencias (s) y errores"""
+    latencias, errores = [], []
+    barrera.wait()
+
+    pasos = [("carga inicial", lambda at: at.run())]
+    pasos += escenario * repeticiones
+    for nombre, accion in pasos:
+        inicio = time.perf_counter()
+        try:
+            accion(at)
+        except Exception as e:
+            errores.append(f"{nombre}: {type(e).__name__}: {e}")
+            errores.extend(_excepciones_app(at, nombre))
+            break
+        latencias.append(time.perf_counter() - inicio)
+        errores.extend(_excepciones_app(at, nombre))
+        if pausa:
+            time.sleep(pausa)
+    return latencias, errores
+
+
+def _excepciones_app(at, nombre):
+    try:
+        excepciones = list(at.exception)
+    except Exception:
+        # La sesión nunca llegó a completar un rerun
+        return []
+    return [f"{nombre}: {ex.proto.type}: {ex.value}" for ex in excepciones]
+
+
+def percentil(valores, p):
+    if len(valores) < 2:
+        return valores[0] if valores else float("nan")
+    return statistics.quantiles(valores, n=100, method="inclusive")[p - 1]
+
+
+def medir(n_sesiones, escenario, repeticiones, pausa, timeout):
+    """Lanza n_sesiones simultáneas y resume latencia, throughput y memoria"""
+    liberar_memoria()
+    # Se crean aquí para que ningún hilo falle antes de llegar a la barrera
+    sesiones = [AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+                for _ in range(n_sesiones)]
+    barrera = threading.Barrier(n_sesiones + 1)
+    memoria = MuestreoMemoria()
+    memoria.start()
+
+    with ThreadPoolExecutor(max_workers=n_sesiones) as ex:
+        futuros = [
+            ex.submit(simular_sesion, at, escenario, barrera, repeticiones, pausa)
+            for at in sesiones
+        ]
+        barrera.wait()
+        inicio = time.perf_counter()
+        resultados = [f.result() for f in futuros]
+        duracion = time.perf_counter() - inicio
+
+    memoria.detener()
+    latencias = [l for r in resultados for l in r[0]]
+    errores = [e for r in resultados for e in r[1]]
+    del resultados, sesiones
+    pico_mb = memoria.pico - memoria.base
+
+    return {
+        "sesiones": n_sesiones,
+        "reruns": len(latencias),
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p95_ms": percentil(latencias, 95) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "reruns_s": len(latencias) / duracion,
+        "pico_mb": pico_mb,
+        "mb_sesion": pico_mb / n_sesiones,
+        "rss_pico_mb": memoria.pico,
+        "errores": len(errores),
+        "detalle_errores": errores[:5],
+    }
+
+
+def imprimir_tabla(filas):
+    encabezado = (f"{'Sesiones':>8} {'Reruns':>7} {'p50 ms':>8} {'p95 ms':>8} "
+                  f"{'p99 ms':>8} {'Reruns/s':>9} {'Pico MB':>8} {'MB/sesión':>10} {'RSS pico':>9} "
+                  f"{'Errores':>8}")
+    print(encabezado)
+    print("-" * len(encabezado))
+    for f in filas:
+        print(f"{f['sesiones']:>8} {f['reruns']:>7} {f['p50_ms']:>8.0f} {f['p95_ms']:>8.0f} "
+              f"{f['p99_ms']:>8.0f} {f['reruns_s']:>9.2f} {f['pico_mb']:>8.1f} {f['mb_sesion']:>10.1f} "
+              f"{f['rss_pico_mb']:>9.0f} {f['errores']:>8}")
+        for error in f["detalle_errores"]:
+            print(f"         ⚠️ {error}")
+    if any(math.isnan(f["rss_pico_mb"]) for f in filas):
+        print("\nℹ️ Memoria no disponible en esta plataforma")
+    else:
+        print("\nPico MB: RSS máximo durante el nivel menos el RSS al iniciarlo")
+
+
+def guardar_csv(filas, ruta):
+    columnas = [c for c in filas[0] if c != "detalle_errores"]
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columnas, delimiter=";", extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(filas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga concurrente de app.py")
+    parser.add_argument("--sesiones", type=int, nargs="+", default=[1, 5, 10, 20],
+                        help="Cantidades de sesiones simultáneas a probar")
+    parser.add_argument("--repeticiones", type=int, default=1,
+                        help="Veces que cada sesión recorre el escenario")
+    parser.add_argument("--pausa", type=float, default=0.0,
+                        help="Segundos de espera entre clics de un mismo usuario")
+    parser.add_argument("--timeout", type=float, default=120.0,
+                        help="Tiempo máximo por rerun en segundos")
+    parser.add_argument("--csv", type=Path, help="Guarda los resultados en este CSV (sep=';')")
+    parser.add_argument("--max-p95", type=float,
+                        help="Falla (código 1) si el p95 de algún nivel supera estos ms")
+    args = parser.parse_args(argv)
+
+    # Los avisos de deprecación de Streamlit ensucian la salida en cada rerun
+    config.set_option("logger.level", "error")
+    streamlit.logger.set_log_level("error")
+    escenario = construir_escenario()
+
+    filas = []
+    with runtime_compartido():
+        # Sesión de calentamiento: importa módulos y deja registrado el Runtime
+        at = AppTest.from_file(str(APP_PATH), default_timeout=args.timeout)
+        simular_sesion(at, escenario, threading.Barrier(1), 1, 0)
+        for n in args.sesiones:
+            print(f"▶️ {n} sesiones...", flush=True)
+            filas.append(medir(n, escenario, args.repeticiones, args.pausa, args.timeout))
+
+    print()
+    imprimir_tabla(filas)
+    if args.csv:
+        guardar_csv(filas, args.csv)
+
+    if any(f["errores"] for f in filas):
+        return 1
+    if args.max_p95 is not None and any(f["p95_ms"] > args.max_p95 for f in filas):
+        print(f"\n🚨 p95 por encima de {args.max_p95:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())